@@ -1,45 +1,220 @@
-import json
+import asyncio
 import os
 import pathlib
+import random
+from collections import deque
+
+import httpx
+import orjson
 import requests
-import feedparser
+from lxml import etree
 
 RSS_URL = os.environ["RSS_URL"]
 KILO_WEBHOOK_URL = os.environ["KILO_WEBHOOK_URL"]
 
 STATE_FILE = pathlib.Path(".podcast_state.json")
 
+# One Session for the whole run: keeps the TCP/TLS connection warm across
+# the HEAD probe, feed GET and webhook POST, and asks for compressed bodies
+SESSION = requests.Session()
+SESSION.headers.update({
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "kilo-podcast/1.0",
+})
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+# Webhook retry policy: exponential backoff with a little jitter
+WEBHOOK_MAX_RETRIES = 4
+WEBHOOK_BASE_DELAY = 0.5
+WEBHOOK_MAX_DELAY = 8.0
+
+async def post_webhook(payload):
+    """POST the payload to the Kilo webhook, retrying transient failures.
+
+    A single flaky 5xx or dropped connection shouldn't throw away the
+    feed fetch + parse work, so retry with exponential backoff and jitter
+    instead of failing the whole run. 4xx responses are not retried.
+    """
+    async with httpx.AsyncClient(timeout=10) as client:
+        for attempt in range(WEBHOOK_MAX_RETRIES):
+            try:
+                r = await client.post(
+                    KILO_WEBHOOK_URL,
+                    content=orjson.dumps(payload),
+                    headers={"Content-Type": "application/json"},
+                )
+                if r.status_code == 409:
+                    # Webhook already has this episode; caller records it
+                    return r
+                if r.status_code < 500:
+                    r.raise_for_status()
+                    return r
+                if attempt == WEBHOOK_MAX_RETRIES - 1:
+                    r.raise_for_status()
+            except httpx.TransportError:
+                if attempt == WEBHOOK_MAX_RETRIES - 1:
+                    raise
+            await asyncio.sleep(
+                min(WEBHOOK_MAX_DELAY, WEBHOOK_BASE_DELAY * 2 ** attempt)
+                + random.random() * 0.1
+            )
+
+# How many already-processed guids to remember beyond last_guid
+PROCESSED_GUIDS_MAX = 64
+
 def load_state():
     if STATE_FILE.exists():
-        return json.loads(STATE_FILE.read_text())
-    return {"last_guid": None}
+        return orjson.loads(STATE_FILE.read_bytes())
+    return {"last_guid": None, "etag": None, "modified": None, "processed_guids": []}
+
+def remember_guid(state, guid):
+    """Record a processed guid, keeping only the most recent few."""
+    if not guid:
+        return
+    guids = deque(state.get("processed_guids") or [], maxlen=PROCESSED_GUIDS_MAX)
+    if guid not in guids:
+        guids.append(guid)
+    state["processed_guids"] = list(guids)
 
 def save_state(state):
-    STATE_FILE.write_text(json.dumps(state, indent=2))
+    new_bytes = orjson.dumps(state, option=orjson.OPT_INDENT_2)
+    # Skip the write when nothing changed (common on retry/no-op runs)
+    if STATE_FILE.exists() and STATE_FILE.read_bytes() == new_bytes:
+        return
+    # Write-then-rename so a crash can't leave a torn state file, which
+    # would force a full re-download next run and defeat the ETag caching
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_bytes(new_bytes)
+    os.replace(tmp, STATE_FILE)
+
+def feed_unchanged(state):
+    """Cheap HEAD probe: True if the feed's validators match what we stored.
+
+    Some servers ignore If-None-Match on GET but still expose a stable
+    ETag/Last-Modified on HEAD, so this lets us skip the body download
+    and parse entirely. Any error means "don't know" -> fetch normally.
+    """
+    try:
+        resp = SESSION.head(
+            RSS_URL,
+            headers={
+                "If-None-Match": state.get("etag") or "",
+                "If-Modified-Since": state.get("modified") or "",
+            },
+            timeout=10,
+            allow_redirects=True,
+        )
+    except requests.RequestException:
+        return False
+    if resp.status_code == 304:
+        return True
+    if resp.status_code == 200:
+        etag = resp.headers.get("ETag")
+        modified = resp.headers.get("Last-Modified")
+        if etag and etag == state.get("etag"):
+            return True
+        if modified and modified == state.get("modified"):
+            return True
+    return False
+
+def parse_first_entry(stream):
+    """Pull the first <item> (RSS) or <entry> (Atom) out of a feed stream.
+
+    We only ever look at the newest episode, so a streaming iterparse that
+    stops at the first closing tag does O(1) work no matter how long the
+    archive feed is. Returns a dict or None if the feed has no entries.
+    """
+    for _, elem in etree.iterparse(
+        stream, events=("end",), tag=("item", ATOM_NS + "entry")
+    ):
+        title = elem.findtext("title") or elem.findtext(ATOM_NS + "title")
 
-def main():
+        link = elem.findtext("link")
+        if link is None:
+            for link_el in elem.iterfind(ATOM_NS + "link"):
+                if link_el.get("rel") in (None, "alternate"):
+                    link = link_el.get("href")
+                    break
+
+        guid = (
+            elem.findtext("guid")
+            or elem.findtext(ATOM_NS + "id")
+            or link
+        )
+        published = elem.findtext("pubDate") or elem.findtext(ATOM_NS + "published")
+
+        audio_url = None
+        enclosure = elem.find("enclosure")
+        if enclosure is not None:
+            audio_url = enclosure.get("url")
+        else:
+            for link_el in elem.iterfind(ATOM_NS + "link"):
+                if link_el.get("rel") == "enclosure":
+                    audio_url = link_el.get("href")
+                    break
+
+        elem.clear()
+        return {
+            "guid": guid,
+            "title": title,
+            "link": link,
+            "published": published,
+            "audio_url": audio_url,
+        }
+    return None
+
+async def main():
     state = load_state()
 
-    feed = feedparser.parse(RSS_URL)
-    if not feed.entries:
+    if state.get("etag") or state.get("modified"):
+        if feed_unchanged(state):
+            print("Feed not modified (HEAD). Exiting.")
+            return
+
+    # Conditional GET: send the cached ETag/Last-Modified so the server can
+    # answer 304 and we skip the body download + parse entirely
+    resp = SESSION.get(
+        RSS_URL,
+        headers={
+            "If-None-Match": state.get("etag") or "",
+            "If-Modified-Since": state.get("modified") or "",
+        },
+        stream=True,
+        timeout=30,
+    )
+    if resp.status_code == 304:
+        print("Feed not modified (304). Exiting.")
+        return
+    resp.raise_for_status()
+
+    # Remember the validators for the next run
+    state["etag"] = resp.headers.get("ETag")
+    state["modified"] = resp.headers.get("Last-Modified")
+
+    # Let urllib3 transparently decompress so iterparse sees raw XML
+    resp.raw.decode_content = True
+    latest = parse_first_entry(resp.raw)
+    resp.close()
+    if latest is None:
         raise RuntimeError("No RSS entries found")
 
-    latest = feed.entries[0]
-    guid = latest.get("guid") or latest.get("id") or latest.get("link")
+    guid = latest["guid"]
 
-    # Idempotency: do nothing if we already processed this episode
-    if state.get("last_guid") == guid:
+    # Idempotency: do nothing if we already processed this episode,
+    # either ourselves or as reported back by the webhook
+    if state.get("last_guid") == guid or guid in (state.get("processed_guids") or []):
+        # Persist fresh validators so the next run can get a 304
+        save_state(state)
         print("No new episode. Exiting.")
         return
 
-    title = latest.get("title", "Untitled")
-    link = latest.get("link", "")
-    published = latest.get("published", "")
+    title = latest["title"] or "Untitled"
+    link = latest["link"] or ""
+    published = latest["published"] or ""
 
     # Enclosure usually contains the audio URL
-    audio_url = None
-    if "enclosures" in latest and latest.enclosures:
-        audio_url = latest.enclosures[0].get("href")
+    audio_url = latest["audio_url"]
 
     payload = {
         "taskType": "podcast_summary",
@@ -53,17 +228,22 @@ def main():
         # (or you can transcribe here and pass transcript text instead).
     }
 
-    r = requests.post(
-        KILO_WEBHOOK_URL,
-        headers={"Content-Type": "application/json"},
-        data=json.dumps(payload),
-        timeout=30,
-    )
+    r = await post_webhook(payload)
     print("Kilo webhook status:", r.status_code)
-    r.raise_for_status()
+
+    # Fold any "already processed" signal from the webhook into state so
+    # future runs can short-circuit before building a payload at all
+    remember_guid(state, r.headers.get("X-Episode-Processed-GUID"))
+    try:
+        body = r.json()
+    except ValueError:
+        body = None
+    if isinstance(body, dict):
+        remember_guid(state, body.get("duplicate_guid"))
 
     # Only mark as processed if webhook accepted
     state["last_guid"] = guid
+    remember_guid(state, guid)
     save_state(state)
 
     # Commit state so the job doesn't repeat
@@ -71,4 +251,4 @@ def main():
     print("Triggered Kilo successfully.")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -9,38 +9,77 @@ Optionally transcribes audio if available.
 import json
 import os
 import re
+import shutil
 import sys
 import pathlib
 import subprocess
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, Any
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional, Dict, Any, Iterator
+
+
+class _SlugTable(dict):
+    """Translation table for str.translate that deletes unmapped characters."""
+
+    def __missing__(self, code):
+        return None
+
+
+def _build_slug_table() -> _SlugTable:
+    """
+    Build the ASCII slug table: letters lowercase, digits/underscore/hyphen
+    kept, whitespace mapped to a hyphen, everything else (including all
+    non-ASCII) deleted.
+    """
+    table = _SlugTable()
+    for code in range(0x80):
+        ch = chr(code)
+        if ch.isalnum() or ch == '_':
+            table[code] = ch.lower()
+        elif ch == '-' or ch.isspace():
+            table[code] = '-'
+    return table
+
+
+_SLUG_TABLE = _build_slug_table()
+
+# Compiled once at import; only used when the translate pass left a run
+_SLUG_DASH = re.compile(r'-{2,}')
 
 
 def sanitize_filename(text: str, max_length: int = 50) -> str:
     """
     Convert text to a safe filename slug.
-    
+
     Args:
         text: The text to sanitize
         max_length: Maximum length of the resulting slug
-        
+
     Returns:
         A safe filename slug
     """
-    # Convert to lowercase
-    slug = text.lower()
-    
-    # Replace spaces and special chars with hyphens
-    slug = re.sub(r'[^\w\s-]', '', slug)
-    slug = re.sub(r'[-\s]+', '-', slug)
-    
+    # One C-level pass: lowercase, drop special chars, whitespace to hyphens
+    slug = text.translate(_SLUG_TABLE)
+
+    # Collapse hyphen runs only when one actually exists
+    if '--' in slug:
+        slug = _SLUG_DASH.sub('-', slug)
+
     # Remove leading/trailing hyphens
     slug = slug.strip('-')
-    
+
     # Truncate to max length
     if len(slug) > max_length:
         slug = slug[:max_length].rstrip('-')
-    
+
     return slug
 
 
@@ -56,97 +95,256 @@ def format_date_for_filename(date_str: str) -> str:
     """
     if not date_str:
         return datetime.utcnow().strftime('%Y-%m-%d')
-    
-    # Try common date formats
-    formats = [
-        '%Y-%m-%d',
-        '%Y-%m-%dT%H:%M:%S%z',
-        '%Y-%m-%dT%H:%M:%SZ',
-        '%a, %d %b %Y %H:%M:%S %z',
-        '%a, %d %b %Y %H:%M:%S %Z',
-    ]
-    
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(date_str, fmt)
-            return dt.strftime('%Y-%m-%d')
-        except ValueError:
-            continue
-    
-    # If all parsing fails, use current date
-    return datetime.utcnow().strftime('%Y-%m-%d')
+
+    # Dispatch on cheap structural cues so we parse at most once instead of
+    # walking a format list and paying for a raised ValueError per miss
+    try:
+        if ',' in date_str:
+            # RFC 2822, the common RSS pubDate shape (handles %z and %Z)
+            dt = parsedate_to_datetime(date_str)
+        elif len(date_str) == 10:
+            dt = datetime.strptime(date_str, '%Y-%m-%d')
+        elif date_str.endswith('Z'):
+            dt = datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%SZ')
+        else:
+            dt = datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S%z')
+        return dt.strftime('%Y-%m-%d')
+    except (ValueError, TypeError):
+        # If parsing fails, use current date
+        return datetime.utcnow().strftime('%Y-%m-%d')
+
+
+_http_session = None
+
+
+def get_http_session():
+    """
+    Return a shared requests.Session, creating it on first use.
+
+    Reusing one Session lets urllib3 pool connections (no fresh TCP/TLS
+    handshake per request) and advertises gzip for compressible responses.
+
+    Returns:
+        A configured requests.Session
+    """
+    global _http_session
+    if _http_session is None:
+        import requests
+        _http_session = requests.Session()
+        _http_session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "User-Agent": "kilo-podcast/1.0",
+        })
+    return _http_session
+
+
+DOWNLOAD_WORKERS = 6
+
+
+def _download_range(audio_url: str, fd: int, start: int, end: int) -> None:
+    """
+    Fetch bytes [start, end] of the file and write them at their offset.
+
+    Args:
+        audio_url: URL of the audio file
+        fd: File descriptor of the pre-allocated output file
+        start: First byte of the range (inclusive)
+        end: Last byte of the range (inclusive)
+    """
+    response = get_http_session().get(
+        audio_url,
+        headers={'Range': f'bytes={start}-{end}'},
+        stream=True,
+        timeout=60,
+    )
+    response.raise_for_status()
+    response.raw.decode_content = True
+    offset = start
+    while True:
+        chunk = response.raw.read(1024 * 1024)
+        if not chunk:
+            break
+        os.pwrite(fd, chunk, offset)
+        offset += len(chunk)
 
 
 def download_audio(audio_url: str, output_path: pathlib.Path) -> bool:
     """
     Download audio file from URL.
-    
+
+    When the server supports byte ranges, the file is split into equal
+    ranges fetched concurrently; parallel flows saturate the link where a
+    single TCP connection cannot. Otherwise falls back to one streamed GET.
+
     Args:
         audio_url: URL of the audio file
         output_path: Path to save the audio file
-        
+
     Returns:
         True if successful, False otherwise
     """
     try:
-        import requests
-        response = requests.get(audio_url, stream=True, timeout=60)
+        session = get_http_session()
+
+        # Probe for range support and total size
+        total_size = 0
+        accepts_ranges = False
+        try:
+            head = session.head(audio_url, timeout=30, allow_redirects=True)
+            if head.ok:
+                total_size = int(head.headers.get('Content-Length', 0))
+                accepts_ranges = head.headers.get('Accept-Ranges', '').lower() == 'bytes'
+        except Exception:
+            pass
+
+        if accepts_ranges and total_size > DOWNLOAD_WORKERS * 1024 * 1024:
+            part = -(-total_size // DOWNLOAD_WORKERS)  # ceil division
+            ranges = [
+                (start, min(start + part, total_size) - 1)
+                for start in range(0, total_size, part)
+            ]
+            with open(output_path, 'wb') as f:
+                f.truncate(total_size)
+                with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+                    futures = [
+                        pool.submit(_download_range, audio_url, f.fileno(), start, end)
+                        for start, end in ranges
+                    ]
+                    for future in futures:
+                        future.result()
+            return True
+
+        response = session.get(audio_url, stream=True, timeout=60)
         response.raise_for_status()
-        
+
+        # Copy in 1 MiB blocks straight from the raw stream; iter_content's
+        # per-chunk Python loop at 8 KiB dominates for multi-hundred-MB audio
+        response.raw.decode_content = True
         with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
+            shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+
         return True
     except Exception as e:
         print(f"Error downloading audio: {e}", file=sys.stderr)
         return False
 
 
+def submit_async_transcription(audio_url: str) -> Optional[str]:
+    """
+    Hand the audio to an async transcription service, if one is configured.
+
+    The service transcribes off the CI runner and POSTs the transcript back
+    to the webhook, which re-triggers this script with the transcript in
+    the payload — so the runner never idles through a 10-minute
+    subprocess.run waiting on whisper.
+
+    Args:
+        audio_url: URL of the audio file to transcribe
+
+    Returns:
+        The service's request id, or None if no service is configured or
+        the submission failed (callers should fall back to local
+        transcription)
+    """
+    service_url = os.environ.get('TRANSCRIBE_ASYNC_URL')
+    callback_url = os.environ.get('KILO_WEBHOOK_URL')
+    if not service_url or not callback_url:
+        return None
+
+    try:
+        response = get_http_session().post(
+            service_url,
+            json={'audio_url': audio_url, 'webhook_endpoint': callback_url},
+            timeout=30,
+        )
+        response.raise_for_status()
+        return response.json().get('request_id')
+    except Exception as e:
+        print(f"Async transcription submit failed: {e}", file=sys.stderr)
+        return None
+
+
+@lru_cache(maxsize=1)
+def _whisper_model():
+    """
+    Load the faster-whisper model once per process, or None if unavailable.
+
+    Keeping the model resident amortizes the weight load across episodes;
+    the CTranslate2 int8 backend is also several times faster than the
+    reference whisper CLI, which re-imports torch and re-loads weights on
+    every invocation.
+
+    Returns:
+        A faster_whisper.WhisperModel, or None if the package or model
+        cannot be loaded
+    """
+    try:
+        from faster_whisper import WhisperModel
+        return WhisperModel('base', compute_type='int8')
+    except Exception as e:
+        print(f"faster-whisper unavailable: {e}", file=sys.stderr)
+        return None
+
+
+@lru_cache(maxsize=1)
+def _whisper_path() -> Optional[str]:
+    """
+    Locate the whisper CLI on PATH, caching the result for the process.
+
+    Returns:
+        Absolute path to the whisper executable, or None if not installed
+    """
+    return shutil.which('whisper')
+
+
 def transcribe_audio(audio_path: pathlib.Path) -> Optional[str]:
     """
     Transcribe audio file using available tools.
     
-    This is a placeholder that checks for common transcription tools.
-    In practice, you might use:
-    - OpenAI Whisper API
-    - Local Whisper model
-    - Other transcription services
-    
+    Prefers the in-process faster-whisper API (model loaded once, no
+    subprocess startup cost) and falls back to the whisper CLI when the
+    package is not installed.
+
     Args:
         audio_path: Path to the audio file
-        
+
     Returns:
         Transcript text if successful, None otherwise
     """
-    # Check if whisper CLI is available
+    model = _whisper_model()
+    if model is not None:
+        try:
+            print("Transcribing with faster-whisper...", file=sys.stderr)
+            segments, _ = model.transcribe(str(audio_path))
+            return " ".join(segment.text.strip() for segment in segments)
+        except Exception as e:
+            print(f"Transcription error: {e}", file=sys.stderr)
+            return None
+
+    # Fall back to the whisper CLI (cached PATH walk, no subprocess)
+    whisper_path = _whisper_path()
+    if not whisper_path:
+        return None
+
     try:
+        # Whisper is available, use it
+        print("Transcribing with Whisper...", file=sys.stderr)
         result = subprocess.run(
-            ['which', 'whisper'],
+            [whisper_path, str(audio_path), '--model', 'base', '--output_format', 'txt'],
             capture_output=True,
             text=True,
-            timeout=5
+            timeout=600  # 10 minutes max
         )
-        
+
         if result.returncode == 0:
-            # Whisper is available, use it
-            print("Transcribing with Whisper...", file=sys.stderr)
-            result = subprocess.run(
-                ['whisper', str(audio_path), '--model', 'base', '--output_format', 'txt'],
-                capture_output=True,
-                text=True,
-                timeout=600  # 10 minutes max
-            )
-            
-            if result.returncode == 0:
-                # Read the generated transcript
-                txt_path = audio_path.with_suffix('.txt')
-                if txt_path.exists():
-                    return txt_path.read_text()
-        
+            # Read the generated transcript
+            txt_path = audio_path.with_suffix('.txt')
+            if txt_path.exists():
+                return txt_path.read_text()
+
     except Exception as e:
         print(f"Transcription error: {e}", file=sys.stderr)
-    
+
     return None
 
 
@@ -236,69 +434,61 @@ def generate_summary(title: str, published: str, episode_url: str,
     return summary
 
 
-def create_markdown_summary(summary: Dict[str, Any]) -> str:
+def _render_section(title: str, bullets) -> Iterator[str]:
     """
-    Create markdown content from summary dictionary.
-    
+    Yield the markdown lines for one bulleted section.
+
+    Args:
+        title: Section heading (without the ## prefix)
+        bullets: Iterable of bullet strings
+    """
+    yield f"## {title}"
+    yield ""
+    yield from (f"- {bullet}" for bullet in bullets)
+    yield ""
+
+
+def _render_summary(summary: Dict[str, Any]) -> Iterator[str]:
+    """
+    Yield every markdown line of the summary document in order.
+
     Args:
         summary: Dictionary containing summary sections
-        
-    Returns:
-        Markdown formatted string
-    """
-    md_lines = [
-        f"# {summary['title']}",
-        "",
-        f"**Published:** {summary['published']}",
-        "",
-        f"**Source:** [{summary['episode_url']}]({summary['episode_url']})",
-        "",
-    ]
-    
+    """
+    yield f"# {summary['title']}"
+    yield ""
+    yield f"**Published:** {summary['published']}"
+    yield ""
+    yield f"**Source:** [{summary['episode_url']}]({summary['episode_url']})"
+    yield ""
+
     if not summary['has_transcript']:
-        md_lines.extend([
-            "> **Note:** Transcript not available; summary is limited.",
-            "",
-        ])
-    
-    # Short Summary
-    md_lines.extend([
-        "## Short Summary",
-        "",
-    ])
-    for bullet in summary['short_summary']:
-        md_lines.append(f"- {bullet}")
-    md_lines.append("")
-    
-    # Detailed Summary
-    md_lines.extend([
-        "## Detailed Summary",
-        "",
-    ])
-    for bullet in summary['detailed_summary']:
-        md_lines.append(f"- {bullet}")
-    md_lines.append("")
-    
-    # Key Takeaways
-    md_lines.extend([
-        "## Key Takeaways",
-        "",
-    ])
-    for bullet in summary['key_takeaways']:
-        md_lines.append(f"- {bullet}")
-    md_lines.append("")
-    
-    # Action Items
+        yield "> **Note:** Transcript not available; summary is limited."
+        yield ""
+
+    yield from _render_section("Short Summary", summary['short_summary'])
+    yield from _render_section("Detailed Summary", summary['detailed_summary'])
+    yield from _render_section("Key Takeaways", summary['key_takeaways'])
+
     if summary['action_items']:
-        md_lines.extend([
-            "## Action Items",
-            "",
-        ])
-        for bullet in summary['action_items']:
-            md_lines.append(f"- {bullet}")
-        md_lines.append("")
-    
-    return "\n".join(md_lines)
+        yield from _render_section("Action Items", summary['action_items'])
+
+
+def write_markdown_summary(summary: Dict[str, Any], fp) -> None:
+    """
+    Stream the markdown summary into an open text file, line by line.
+
+    Writing straight to the (buffered) file handle keeps peak memory at
+    one line instead of materializing the whole document as a string
+    before encoding it a second time.
+
+    Args:
+        summary: Dictionary containing summary sections
+        fp: Writable text file object
+    """
+    for line in _render_summary(summary):
+        fp.write(line)
+        fp.write("\n")
 
 
 def create_git_branch(branch_name: str) -> bool:
@@ -312,17 +502,14 @@ def create_git_branch(branch_name: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        # Configure git if needed
-        subprocess.run(['git', 'config', 'user.name', 'Podcast Summary Bot'], check=False)
-        subprocess.run(['git', 'config', 'user.email', 'bot@podcast-summary.local'], check=False)
-        
-        # Create and checkout branch
+        # Create and checkout branch; committer identity is passed with -c
+        # at commit time, so no separate `git config` processes are needed
         result = subprocess.run(
             ['git', 'checkout', '-b', branch_name],
             capture_output=True,
             text=True
         )
-        
+
         return result.returncode == 0
     except Exception as e:
         print(f"Error creating branch: {e}", file=sys.stderr)
@@ -342,15 +529,18 @@ def commit_and_push(branch_name: str, file_path: pathlib.Path, commit_message: s
         True if successful, False otherwise
     """
     try:
-        # Add file
-        subprocess.run(['git', 'add', str(file_path)], check=True)
-        
-        # Commit
-        subprocess.run(['git', 'commit', '-m', commit_message], check=True)
-        
-        # Push
-        subprocess.run(['git', 'push', '-u', 'origin', branch_name], check=True)
-        
+        # One shell child instead of three git spawns; file path, message
+        # and branch are passed as positional args so nothing is interpolated
+        subprocess.run(
+            ['sh', '-c',
+             'git add -- "$1" && '
+             'git -c user.name="Podcast Summary Bot" '
+             '-c user.email=bot@podcast-summary.local commit -m "$2" && '
+             'git push -u origin "$3"',
+             'git-batch', str(file_path), commit_message, branch_name],
+            check=True
+        )
+
         return True
     except Exception as e:
         print(f"Error committing/pushing: {e}", file=sys.stderr)
@@ -392,19 +582,27 @@ def create_pull_request(branch_name: str, title: str, body: str) -> bool:
 def main():
     """Main entry point for the podcast summarization agent."""
     
-    # Read JSON payload from stdin or environment variable
+    # Read JSON payload from environment variable or stdin. Reading raw
+    # bytes skips the str transcode and hands the parser a single buffer,
+    # which matters once payloads carry full transcripts inline
     payload_json = os.environ.get('PODCAST_PAYLOAD')
-    
-    if not payload_json:
+
+    if payload_json:
+        payload_bytes = payload_json.encode()
+    else:
         # Try reading from stdin
-        payload_json = sys.stdin.read()
-    
-    if not payload_json:
+        payload_bytes = sys.stdin.buffer.read()
+
+    if not payload_bytes:
         print("Error: No payload provided", file=sys.stderr)
         sys.exit(1)
-    
+
     try:
-        payload = json.loads(payload_json)
+        # orjson's Rust parser matters once payloads carry full transcripts
+        if orjson is not None:
+            payload = orjson.loads(payload_bytes)
+        else:
+            payload = json.loads(payload_bytes)
     except json.JSONDecodeError as e:
         print(f"Error parsing JSON payload: {e}", file=sys.stderr)
         sys.exit(1)
@@ -424,20 +622,35 @@ def main():
     # Create summary filename
     filename = f"{safe_date}-{safe_title}.md"
     summaries_dir = pathlib.Path('summaries')
-    summaries_dir.mkdir(exist_ok=True)
-    
+    os.makedirs(summaries_dir, exist_ok=True)
+
     summary_path = summaries_dir / filename
-    
-    # Check if summary already exists
-    if summary_path.exists():
+
+    # Check if summary already exists with one lstat instead of the
+    # follow-symlink stat + extra syscalls Path.exists() performs
+    try:
+        os.lstat(summary_path)
+    except FileNotFoundError:
+        pass
+    else:
         print(f"Summary already exists: {summary_path}", file=sys.stderr)
         print("Updating existing summary...", file=sys.stderr)
     
-    # Attempt transcription if audio URL is provided
-    transcript = None
-    if audio_url:
+    # A callback payload already carries the transcript; otherwise try to
+    # offload transcription asynchronously, and only transcribe locally
+    # as a last resort
+    transcript = payload.get('transcript')
+    if transcript:
+        print("Transcript provided in payload", file=sys.stderr)
+    elif audio_url:
         print(f"Audio URL provided: {audio_url}", file=sys.stderr)
-        
+
+        request_id = submit_async_transcription(audio_url)
+        if request_id:
+            print(f"Transcription submitted (request {request_id}); "
+                  "summary will be generated on webhook callback", file=sys.stderr)
+            return
+
         # Download audio
         temp_audio = pathlib.Path(f'/tmp/podcast_audio_{safe_date}_{safe_title}.mp3')
         if download_audio(audio_url, temp_audio):
@@ -457,11 +670,9 @@ def main():
     # Generate summary
     summary = generate_summary(title, published, episode_url, transcript)
     
-    # Create markdown content
-    markdown_content = create_markdown_summary(summary)
-    
-    # Write summary file
-    summary_path.write_text(markdown_content)
+    # Stream markdown content straight into the summary file
+    with summary_path.open('w', encoding='utf-8', buffering=1 << 20) as fp:
+        write_markdown_summary(summary, fp)
     print(f"Summary written to: {summary_path}", file=sys.stderr)
     
     # Create git branch
@@ -485,10 +696,9 @@ def main():
 ### Short Summary
 
 """
-            for bullet in summary['short_summary']:
-                pr_body += f"- {bullet}\n"
-            
-            pr_body += f"\n**Full summary:** [View file](summaries/{filename})"
+            pr_body += "\n".join(f"- {bullet}" for bullet in summary['short_summary'])
+
+            pr_body += f"\n\n**Full summary:** [View file](summaries/{filename})"
             
             if create_pull_request(branch_name, pr_title, pr_body):
                 print("Pull request created successfully", file=sys.stderr)